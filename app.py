@@ -1,10 +1,11 @@
 import streamlit as st
 from main import (
     extract_text_from_pdf,
-    split_into_sections,
-    summarize_section,
+    extract_sections,
+    iter_section_summaries,
     extract_keywords,
     initialize_summarizer,
+    PDF_BACKENDS,
 )
 
 st.title("📄 Research Paper Summarizer")
@@ -28,17 +29,25 @@ if uploaded_file is not None:
             index=0  # Lightweight T5 model (lightweight model)
         )
 
-        # Initialize selected summarizer
-        with st.spinner(f"Loading {model_name}..."):
-            summarizer = initialize_summarizer(model_name)
+        # Initialize selected summarizer, keeping it in the session until the model changes
+        if st.session_state.get("model_name") != model_name:
+            with st.spinner(f"Loading {model_name}..."):
+                st.session_state["summarizer"] = initialize_summarizer(model_name)
+            st.session_state["model_name"] = model_name
+        summarizer = st.session_state["summarizer"]
 
-        # Extract text from uploaded PDF
-        with st.spinner("Extracting text from PDF..."):
-            full_text = extract_text_from_pdf(uploaded_file)
+        # PDF backend selection dropdown
+        pdf_backend = st.selectbox(
+            "Select PDF Text Backend",
+            options=PDF_BACKENDS,
+            index=0  # pypdfium2 (raw text layer, no layout analysis)
+        )
+
+        pdf_bytes = uploaded_file.getvalue()
 
-        # Split into predefined sections (with fallback for poorly formatted PDFs)
-        with st.spinner("Detecting sections..."):
-            sections = split_into_sections(full_text)  # Returns a dictionary
+        # Extract predefined sections from uploaded PDF in a single pass over its pages
+        with st.spinner("Extracting sections from PDF..."):
+            sections = extract_sections(pdf_bytes, backend=pdf_backend)  # Returns a dictionary
 
         # Display available sections and let users select which ones to summarize
         selected_sections = st.multiselect(
@@ -62,29 +71,28 @@ if uploaded_file is not None:
         }
 
         if selected_sections:
-            summaries = {}
-
-            # Summarize selected sections with selected length parameters
-            for section_name in selected_sections:
-                if section_name in sections:
-                    with st.spinner(f"Summarizing {section_name}..."):
-                        summaries[section_name] = summarize_section(
-                            summarizer,
-                            section_name,
-                            sections[section_name],
-                            max_length=length_params[summary_length]["max_length"],
-                            min_length=length_params[summary_length]["min_length"]
-                        )
-
-            # Display summaries
+            # Reserve a slot per section so summaries keep the selected order as they arrive
             st.subheader("Summaries")
-            for section_name, summary in summaries.items():
-                st.write(f"### {section_name}")
-                st.write(summary)
+            placeholders = {
+                section_name: st.empty() for section_name in selected_sections if section_name in sections
+            }
+
+            # Summarize selected sections in batched calls, displaying each summary as soon as it is ready
+            with st.spinner(f"Summarizing {', '.join(placeholders)}..."):
+                for section_name, summary in iter_section_summaries(
+                    summarizer,
+                    {name: sections[name] for name in placeholders},
+                    max_length=length_params[summary_length]["max_length"],
+                    min_length=length_params[summary_length]["min_length"]
+                ):
+                    with placeholders[section_name].container():
+                        st.write(f"### {section_name}")
+                        st.write(summary)
 
         # Optionally extract keywords from the full paper or specific sections
         if st.checkbox("Extract Keywords"):
             with st.spinner("Extracting keywords..."):
+                full_text = extract_text_from_pdf(pdf_bytes, backend=pdf_backend)
                 keywords = extract_keywords(full_text)
 
             # Display extracted keywords as a list or table
@@ -1,34 +1,141 @@
-import fitz  # PyMuPDF
+import functools
+import hashlib
+import heapq
+import math
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from transformers import pipeline
-from wordcloud import WordCloud  # For generating word clouds
-import matplotlib.pyplot as plt  # For displaying the word cloud
+import threading
+from collections import Counter, OrderedDict
+import streamlit as st
+import torch
+import transformers
+from packaging.version import Version
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from transformers import AutoConfig, AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+from pdf_pages import (
+    PDF_BACKENDS,
+    count_pages,
+    extract_page_range,
+    iter_page_texts,
+    map_page_ranges,
+    merge_segments,
+    split_into_segments,
+    split_page_range,
+)
+
+# Smaller models sharing a tokenizer with larger ones, used as drafts for speculative decoding.
+# Assisted generation needs a dynamic KV cache, so on GPU both models of each pair run uncompiled:
+# single-chunk requests use the draft, larger ones take the batched eager path.
+DRAFT_MODELS = {
+    "t5-base": "t5-small",
+    "facebook/bart-large-cnn": "sshleifer/distilbart-cnn-6-6",
+}
+
+# Installed transformers release, used where its API changed between versions
+TRANSFORMERS_VERSION = Version(transformers.__version__)
+
+# Page count from which PDF text extraction is spread across worker processes
+PARALLEL_MIN_PAGES = 64
+
+# Number of generated section summaries kept in memory across all sessions
+SUMMARY_CACHE_SIZE = 512
+
+# Words of two or more characters, as in scikit-learn's TfidfVectorizer. The greedy \w+ makes
+# its \b anchors redundant with findall, and dropping them makes scanning noticeably faster.
+TOKEN_RE = re.compile(r"\w\w+")
 
 # Function to initialize the summarization pipeline dynamically
+@st.cache_resource(show_spinner=False)
 def initialize_summarizer(model_name="t5-small"):
     """
     Initialize the Hugging Face summarization pipeline with the selected model.
+    Cached per model name so the weights are loaded (and compiled) once and shared across reruns and sessions.
     :param model_name: Name of the model to use for summarization.
     :return: Summarization pipeline object.
     """
-    return pipeline("summarization", model=model_name, device=-1)  # Force CPU usage
+    device = 0 if torch.cuda.is_available() else -1  # Use the first GPU when available
+    model = _load_model(model_name, device, compile_model=model_name not in DRAFT_MODELS)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=device)
+
+# Function to initialize the draft model used for speculative decoding
+@st.cache_resource(show_spinner=False)
+def initialize_draft_model(model_name):
+    """
+    Load the small model that drafts tokens for the selected model to verify (assisted generation).
+    Only used on GPU, where verifying several drafted tokens per forward pass pays off.
+    :param model_name: Name of the model used for summarization.
+    :return: Draft model, or None if the model has no paired draft model or no GPU is available.
+    """
+    if not torch.cuda.is_available() or model_name not in DRAFT_MODELS:
+        return None
+    return _load_model(DRAFT_MODELS[model_name], 0, compile_model=False)
+
+def _load_model(model_name, device, compile_model=True):
+    """
+    Load a summarization model with the precision and optimizations suited to the device.
+    :param model_name: Name of the model to load.
+    :param device: GPU index, or -1 for CPU.
+    :param compile_model: Whether to compile the model with a static KV cache on GPU when supported.
+    :return: Model ready for generation.
+    """
+    config = AutoConfig.from_pretrained(model_name)
+    if device >= 0 and torch.cuda.is_bf16_supported():
+        dtype = torch.bfloat16
+    elif device >= 0 and config.model_type != "t5":
+        dtype = torch.float16  # T5 activations overflow in FP16, so T5 stays in FP32 without BF16
+    else:
+        dtype = torch.float32  # Half precision is slower than FP32 on most CPUs
+
+    # transformers 4.56 renamed torch_dtype to dtype; older releases would silently ignore dtype
+    dtype_kwarg = "dtype" if TRANSFORMERS_VERSION >= Version("4.56") else "torch_dtype"
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, **{dtype_kwarg: dtype})
+    if device >= 0:
+        model = model.to(f"cuda:{device}")
+        if compile_model and _supports_compiled_static_cache(model):
+            # A fixed-size KV cache keeps shapes stable across decoding steps, so the CUDA graphs
+            # captured by "reduce-overhead" are reused instead of re-recorded at every step
+            model.generation_config.cache_implementation = "static"
+            model.forward = torch.compile(model.forward, mode="reduce-overhead")
+    else:
+        # Dynamic INT8 quantization of the linear layers for faster, smaller CPU inference
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    # Greedy decoding with the KV cache on, so each step reuses earlier attention states
+    model.generation_config.use_cache = True
+    model.generation_config.num_beams = 1
+    model.generation_config.early_stopping = False  # Only meaningful for beam search
+    return model
+
+def _supports_compiled_static_cache(model):
+    """
+    Check whether a model can decode with a static KV cache under torch.compile.
+    Newer transformers releases expose this as _can_compile_fullgraph; older ones as _supports_static_cache.
+    :param model: Loaded summarization model.
+    :return: True if the model can be compiled against a static cache.
+    """
+    can_compile = getattr(model, "_can_compile_fullgraph", None)
+    if can_compile is None:
+        can_compile = getattr(model, "_supports_static_cache", False)
+    return bool(can_compile)
 
 # Function to extract text from a PDF
-def extract_text_from_pdf(uploaded_file):
+@st.cache_data(show_spinner=False)
+def extract_text_from_pdf(pdf_bytes, backend="pypdfium2"):
     """
-    Extract text from a PDF file uploaded via Streamlit's st.file_uploader.
-    :param uploaded_file: Streamlit UploadedFile object.
+    Extract text from the bytes of a PDF file uploaded via Streamlit's st.file_uploader.
+    Cached on the file contents so widget interactions don't re-parse the same PDF.
+    :param pdf_bytes: Raw bytes of the PDF (e.g. UploadedFile.getvalue()).
+    :param backend: PDF library used to read the text, one of PDF_BACKENDS.
     :return: Full text extracted from the PDF.
     """
-    pdf_bytes = uploaded_file.read()
-    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-        full_text = ""
-        for page in doc:
-            full_text += page.get_text()
-    return full_text
+    page_count = count_pages(pdf_bytes, backend)
+    if page_count < PARALLEL_MIN_PAGES:
+        return "".join(iter_page_texts(pdf_bytes, backend, 0, page_count))
+
+    return "".join(map_page_ranges(extract_page_range, pdf_bytes, backend, page_count))
 
 # Function to split text into sections
+@st.cache_data(show_spinner=False)
 def split_into_sections(text):
     """
     Splits the text into predefined sections based on headings.
@@ -36,75 +143,235 @@ def split_into_sections(text):
     :param text: Full text of the research paper.
     :return: Dictionary with section names as keys and combined content as values.
     """
-    section_headings = [
-        r'\bABSTRACT\b', r'\bINTRODUCTION\b', r'\bBACKGROUND\b',
-        r'\bMETHODS?\b', r'\bMATERIALS AND METHODS\b',
-        r'\bRESULTS?\b', r'\bDISCUSSION\b',
-        r'\bCONCLUSION\b', r'\bREFERENCES?\b',
-        r'\bACKNOWLEDGMENTS?\b', r'\bKEYWORDS?\b',
-        r'\bREVIEW OF LITERATURE\b', r'\bRELATED WORK\b',
-        r'\bLIMITATIONS?\b', r'\bFUTURE WORK\b',
-        r'\bAPPENDICES?\b', r'\bFIGURES AND TABLES\b',
-        r'\bETHICS STATEMENT\b',
-        r'\bFUNDING STATEMENT\b',
-        r'\bCONFLICT OF INTEREST STATEMENT\b'
+    return merge_segments(split_into_segments([text]))
+
+# Function to extract sections directly from a PDF
+@st.cache_data(show_spinner=False)
+def extract_sections(pdf_bytes, backend="pypdfium2"):
+    """
+    Extract the predefined sections of a PDF in a single pass over its pages.
+    Equivalent to split_into_sections(extract_text_from_pdf(pdf_bytes)) without building the full text.
+    :param pdf_bytes: Raw bytes of the PDF (e.g. UploadedFile.getvalue()).
+    :param backend: PDF library used to read the text, one of PDF_BACKENDS.
+    :return: Dictionary with section names as keys and combined content as values.
+    """
+    page_count = count_pages(pdf_bytes, backend)
+    if page_count < PARALLEL_MIN_PAGES:
+        return merge_segments(split_into_segments(iter_page_texts(pdf_bytes, backend, 0, page_count)))
+
+    segment_lists = map_page_ranges(split_page_range, pdf_bytes, backend, page_count)
+    return merge_segments(segment for segments in segment_lists for segment in segments)
+
+# Function to split sections into summarizable chunks
+def chunk_sections(tokenizer, section_contents, prefix="", overlap=50):
+    """
+    Tokenizes sections of the research paper into chunks that fit the model's input limit.
+    All sections are encoded in one tokenizer call; long sections overflow into extra chunks
+    cut on token boundaries, so no chunk is silently truncated or split mid-word.
+    :param tokenizer: Fast tokenizer of the summarization model.
+    :param section_contents: List of section contents.
+    :param prefix: Task prefix the model expects before every input (e.g. T5's "summarize: ").
+    :param overlap: Number of tokens shared between consecutive chunks of a section.
+    :return: Tuple of (list of input id lists, index into section_contents for each chunk).
+    """
+    prefix_ids = list(_prefix_ids(tokenizer, prefix))
+    window = min(tokenizer.model_max_length, 1024) - len(prefix_ids) - tokenizer.num_special_tokens_to_add()
+
+    encoding = tokenizer(
+        section_contents,
+        add_special_tokens=False,
+        max_length=window,
+        truncation=True,
+        stride=overlap,
+        return_overflowing_tokens=True,
+    )
+    chunk_ids = [
+        tokenizer.build_inputs_with_special_tokens(prefix_ids + ids)
+        for ids in encoding['input_ids']
     ]
-    
-    pattern = "|".join(section_headings)
-    matches = list(re.finditer(pattern, text, re.IGNORECASE))
-    
-    sections = {}
-    for i, match in enumerate(matches):
-        start_idx = match.start()
-        end_idx = matches[i + 1].start() if i + 1 < len(matches) else len(text)
-        section_name = match.group().strip().upper()
-        section_content = text[start_idx:end_idx].strip()
-        
-        if section_name in sections:
-            sections[section_name] += "\n" + section_content
+    return chunk_ids, encoding['overflow_to_sample_mapping']
+
+def _task_prefix(summarizer):
+    """
+    Find the task prefix the summarization model expects (e.g. T5's "summarize: ").
+    Newer transformers releases keep it on the pipeline; older ones copy it into the model config.
+    :param summarizer: Summarization pipeline object.
+    :return: Task prefix, or an empty string if the model has none.
+    """
+    config = summarizer.model.config
+    return (
+        getattr(summarizer, "prefix", None)
+        or getattr(config, "prefix", None)
+        or (getattr(config, "task_specific_params", None) or {}).get("summarization", {}).get("prefix", "")
+    )
+
+@functools.lru_cache(maxsize=None)
+def _prefix_ids(tokenizer, prefix):
+    """
+    Tokenize a model's task prefix once per tokenizer; it is shared by every chunk of every call.
+    :param tokenizer: Tokenizer of the summarization model.
+    :param prefix: Task prefix the model expects before every input (e.g. T5's "summarize: ").
+    :return: Tuple of prefix token ids, empty if there is no prefix.
+    """
+    return tuple(tokenizer(prefix, add_special_tokens=False)['input_ids']) if prefix else ()
+
+# Function to summarize several sections, yielding each summary as soon as it is ready
+def iter_section_summaries(summarizer, sections, max_length=150, min_length=50, batch_size=8):
+    """
+    Summarizes the given sections of the research paper, yielding each section once its summary is ready.
+    Sections no longer than min_length words are returned as-is, and summaries are cached by
+    model, content and length settings so unchanged sections are not summarized again.
+    :param summarizer: Summarization pipeline object.
+    :param sections: Dictionary with section names as keys and section content as values.
+    :param max_length: Maximum length of the summary.
+    :param min_length: Minimum length of the summary.
+    :param batch_size: Number of chunks per forward pass.
+    :return: Generator of (section name, summarized text) tuples in order of completion.
+    """
+    model_name = summarizer.model.name_or_path
+
+    pending = {}
+    cache_keys = {}
+    for section_name, section_content in sections.items():
+        if len(section_content.split()) <= min_length:
+            yield section_name, section_content  # Too short to be worth summarizing
+            continue
+        content_hash = hashlib.sha1(section_content.encode()).hexdigest()
+        cache_keys[section_name] = (model_name, content_hash, max_length, min_length)
+        summary = _get_cached_summary(cache_keys[section_name])
+        if summary is not None:
+            yield section_name, summary
         else:
-            sections[section_name] = section_content
-    
-    return sections
+            pending[section_name] = section_content
+
+    if pending:
+        for section_name, summary in _generate_summaries(summarizer, pending, max_length, min_length, batch_size):
+            _store_cached_summary(cache_keys[section_name], summary)
+            yield section_name, summary
+
+@st.cache_resource(show_spinner=False)
+def _summary_cache():
+    """
+    Store of generated summaries shared by all sessions, keyed on
+    (model name, content hash, max length, min length) and kept in least-recently-used order.
+    :return: Tuple of (OrderedDict mapping cache keys to summarized text, lock guarding it).
+    """
+    return OrderedDict(), threading.Lock()
 
-# Function to summarize a specific section
-def summarize_section(summarizer, section_name, section_content, max_length=150, min_length=50):
+def _get_cached_summary(key):
     """
-    Summarizes a specific section of the research paper using the selected model.
+    Look up a generated summary and mark it as recently used.
+    :param key: Cache key of the summary.
+    :return: Summarized text, or None if it is not cached.
+    """
+    summaries, lock = _summary_cache()
+    with lock:
+        if key not in summaries:
+            return None
+        summaries.move_to_end(key)
+        return summaries[key]
+
+def _store_cached_summary(key, summary):
+    """
+    Store a generated summary, evicting the least recently used ones beyond SUMMARY_CACHE_SIZE.
+    :param key: Cache key of the summary.
+    :param summary: Summarized text.
+    """
+    summaries, lock = _summary_cache()
+    with lock:
+        summaries[key] = summary
+        summaries.move_to_end(key)
+        while len(summaries) > SUMMARY_CACHE_SIZE:
+            summaries.popitem(last=False)
+
+def _generate_summaries(summarizer, sections, max_length, min_length, batch_size):
+    """
+    Runs the model over the chunks of all given sections in batches.
+    Chunks from all sections are tokenized once and sent through the model together. A single chunk
+    is decoded with speculative decoding instead when the model has a draft model.
     :param summarizer: Summarization pipeline object.
-    :param section_name: Name of the section (e.g., Abstract).
-    :param section_content: Content of the section.
+    :param sections: Dictionary with section names as keys and section content as values.
     :param max_length: Maximum length of the summary.
     :param min_length: Minimum length of the summary.
-    :return: Summarized text for the section.
-    """
-    if len(section_content.split()) > 500:
-        chunks = [section_content[i:i + 1000] for i in range(0, len(section_content), 1000)]
-        summarized_chunks = [
-            summarizer(chunk, max_length=max_length, min_length=min_length, do_sample=False)[0]['summary_text']
-            for chunk in chunks
-        ]
-        summary = " ".join(summarized_chunks)
-    else:
-        summary = summarizer(section_content, max_length=max_length, min_length=min_length, do_sample=False)[0]['summary_text']
-    
-    return summary
+    :param batch_size: Number of chunks per forward pass.
+    :return: Generator of (section name, summarized text) tuples, each yielded after the batch
+             containing the last chunk of that section.
+    """
+    model, tokenizer = summarizer.model, summarizer.tokenizer
+    section_names = list(sections)
+    chunk_ids, chunk_owners = chunk_sections(
+        tokenizer,
+        [sections[name] for name in section_names],
+        prefix=_task_prefix(summarizer),
+    )
+
+    generate_kwargs = {}
+    # Assisted generation only decodes one sequence at a time, so it is used only when there is a
+    # single chunk; with more chunks batching wins. It also needs a dynamic KV cache, which is why
+    # models with a draft pair are never compiled against a static cache.
+    if len(chunk_ids) == 1 and model.generation_config.cache_implementation != "static":
+        draft_model = initialize_draft_model(model.name_or_path)
+        if draft_model is not None:
+            generate_kwargs['assistant_model'] = draft_model
+
+    # Padding to a multiple of 64 limits the distinct input shapes a compiled model sees;
+    # uncompiled models would only spend extra encoder work on the padding
+    pad_to_multiple_of = 64 if model.generation_config.cache_implementation == "static" else None
+
+    summarized_chunks = {section_name: [] for section_name in section_names}
+    remaining_chunks = Counter(chunk_owners)
+    for start in range(0, len(chunk_ids), batch_size):
+        batch = tokenizer.pad(
+            {'input_ids': chunk_ids[start:start + batch_size]},
+            pad_to_multiple_of=pad_to_multiple_of,
+            return_tensors="pt",
+        )
+        with torch.inference_mode():
+            output_ids = model.generate(
+                **batch.to(model.device),
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                num_beams=1,
+                use_cache=True,
+                no_repeat_ngram_size=3,
+                **generate_kwargs,
+            )
+        summaries = tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+        for owner, summary in zip(chunk_owners[start:start + batch_size], summaries):
+            section_name = section_names[owner]
+            summarized_chunks[section_name].append(summary.strip())
+            remaining_chunks[owner] -= 1
+            if remaining_chunks[owner] == 0:
+                yield section_name, " ".join(summarized_chunks[section_name])
 
 # Function to extract keywords using TF-IDF
+@st.cache_data(show_spinner=False)
 def extract_keywords(text, top_n=10):
-    vectorizer = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform([text])
-    
-    keywords = vectorizer.get_feature_names_out()
-    scores = tfidf_matrix.toarray().flatten()
-    
-    sorted_indices = scores.argsort()[::-1]
-    top_keywords = [(keywords[i], scores[i]) for i in sorted_indices[:top_n]]
+    """
+    Extracts the top keywords of a single document ranked by TF-IDF.
+    With one document every term has the same IDF, so TF-IDF reduces to the
+    L2-normalized term counts, which are computed directly instead of through TfidfVectorizer.
+    :param text: Full text of the research paper.
+    :param top_n: Number of keywords to return.
+    :return: List of (keyword, score) tuples sorted by descending score.
+    """
+    # Count every token in C first, then drop stop words from the much smaller set of distinct terms
+    counts = Counter(TOKEN_RE.findall(text.lower()))
+    for stop_word in ENGLISH_STOP_WORDS & counts.keys():
+        del counts[stop_word]
+    norm = math.sqrt(sum(n * n for n in counts.values())) or 1.0
     
-    return top_keywords
+    # Highest counts first, ties broken alphabetically so the ranking doesn't depend on token order
+    top_counts = heapq.nsmallest(top_n, counts.items(), key=lambda item: (-item[1], item[0]))
+    return [(keyword, n / norm) for keyword, n in top_counts]
 
 # Function to generate a word cloud from extracted keywords
 def generate_word_cloud(keywords):
+    # Imported lazily: the Streamlit app never draws word clouds, so startup shouldn't pay for them
+    from wordcloud import WordCloud  # For generating word clouds
+    import matplotlib.pyplot as plt  # For displaying the word cloud
+
     keyword_dict = {word: score for word, score in keywords}
     
     wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(keyword_dict)
@@ -0,0 +1,169 @@
+"""
+Page-level PDF helpers for main.py. Large PDFs are processed by worker processes that import
+this module, so it depends only on the PDF libraries and not on torch, transformers or streamlit.
+"""
+import fitz  # PyMuPDF
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pypdfium2 as pdfium
+
+# Supported PDF text backends: pypdfium2 reads the raw text layer, PyMuPDF also analyses layout
+PDF_BACKENDS = ["pypdfium2", "pymupdf"]
+
+# PDFium must never be called from two threads at once, even on different documents, and
+# Streamlit runs each session on its own thread, so every in-process pypdfium2 call holds this lock
+PDFIUM_LOCK = threading.Lock()
+
+# Section headings recognized in research papers, compiled once at import time
+SECTION_HEADINGS = [
+    r'ABSTRACT', r'INTRODUCTION', r'BACKGROUND',
+    r'METHODS?', r'MATERIALS AND METHODS',
+    r'RESULTS?', r'DISCUSSION',
+    r'CONCLUSION', r'REFERENCES?',
+    r'ACKNOWLEDGMENTS?', r'KEYWORDS?',
+    r'REVIEW OF LITERATURE', r'RELATED WORK',
+    r'LIMITATIONS?', r'FUTURE WORK',
+    r'APPENDICES?', r'FIGURES AND TABLES',
+    r'ETHICS STATEMENT',
+    r'FUNDING STATEMENT',
+    r'CONFLICT OF INTEREST STATEMENT'
+]
+SECTION_RE = re.compile(r'\b(?:' + "|".join(SECTION_HEADINGS) + r')\b', re.IGNORECASE)
+
+# Function to count the pages of a PDF
+def count_pages(pdf_bytes, backend):
+    """
+    Count the pages of a PDF.
+    :param pdf_bytes: Raw bytes of the PDF.
+    :param backend: PDF library used to open the document, one of PDF_BACKENDS.
+    :return: Number of pages.
+    """
+    if backend == "pypdfium2":
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_bytes)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+    elif backend == "pymupdf":
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            return doc.page_count
+    else:
+        raise ValueError(f"Unknown PDF backend {backend!r}, expected one of {PDF_BACKENDS}")
+
+# Function to read the text of a range of PDF pages
+def iter_page_texts(pdf_bytes, backend, start, stop):
+    """
+    Yield the text of pages [start, stop) of a PDF, each ending with a newline.
+    pypdfium2 returns the raw text layer; PyMuPDF additionally runs its layout analysis.
+    :param pdf_bytes: Raw bytes of the PDF.
+    :param backend: PDF library used to read the text, one of PDF_BACKENDS.
+    :param start: Index of the first page to extract.
+    :param stop: Index one past the last page to extract.
+    :return: Generator of page texts.
+    """
+    if backend == "pypdfium2":
+        # The lock is taken per call rather than across yields, so a paused generator never holds it
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            for i in range(start, stop):
+                with PDFIUM_LOCK:
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range().replace("\r\n", "\n")
+                    textpage.close()
+                    page.close()
+                yield text if text.endswith("\n") else text + "\n"
+        finally:
+            with PDFIUM_LOCK:
+                pdf.close()
+    elif backend == "pymupdf":
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            for i in range(start, stop):
+                yield doc.load_page(i).get_text()
+    else:
+        raise ValueError(f"Unknown PDF backend {backend!r}, expected one of {PDF_BACKENDS}")
+
+# Function to extract the text of a range of PDF pages
+def extract_page_range(pdf_bytes, backend, start, stop):
+    """
+    Extract the text of pages [start, stop) of a PDF. Runs in a worker process.
+    :param pdf_bytes: Raw bytes of the PDF.
+    :param backend: PDF library used to read the text, one of PDF_BACKENDS.
+    :param start: Index of the first page to extract.
+    :param stop: Index one past the last page to extract.
+    :return: Text of the page range.
+    """
+    return "".join(iter_page_texts(pdf_bytes, backend, start, stop))
+
+# Function to split a range of PDF pages into heading segments
+def split_page_range(pdf_bytes, backend, start, stop):
+    """
+    Split the text of pages [start, stop) of a PDF into heading segments. Runs in a worker process.
+    :param pdf_bytes: Raw bytes of the PDF.
+    :param backend: PDF library used to read the text, one of PDF_BACKENDS.
+    :param start: Index of the first page to extract.
+    :param stop: Index one past the last page to extract.
+    :return: List of segments as returned by split_into_segments.
+    """
+    return split_into_segments(iter_page_texts(pdf_bytes, backend, start, stop))
+
+# Function to split text into heading segments
+def split_into_segments(texts):
+    """
+    Split consecutive pieces of text (e.g. pages) into segments that each start at a section heading.
+    :param texts: Iterable of text pieces in document order.
+    :return: List of (section_name, text) tuples. The first segment has section_name None and
+             holds the text before the first heading, which continues the previous segment if any.
+    """
+    segments = [(None, [])]
+    for text in texts:
+        pos = 0
+        for match in SECTION_RE.finditer(text):
+            segments[-1][1].append(text[pos:match.start()])
+            segments.append((match.group().strip().upper(), []))
+            pos = match.start()
+        segments[-1][1].append(text[pos:])
+    return [(section_name, "".join(parts)) for section_name, parts in segments]
+
+# Function to merge heading segments into sections
+def merge_segments(segments):
+    """
+    Combine heading segments into sections, appending the content of repeated headings.
+    :param segments: Iterable of (section_name, text) tuples; None continues the previous segment.
+    :return: Dictionary with section names as keys and combined content as values.
+    """
+    occurrences = []
+    for section_name, text in segments:
+        if section_name is not None:
+            occurrences.append((section_name, [text]))
+        elif occurrences:
+            occurrences[-1][1].append(text)  # Text before the first heading is dropped
+
+    section_parts = {}
+    for section_name, parts in occurrences:
+        section_parts.setdefault(section_name, []).append("".join(parts).strip())
+    return {section_name: "\n".join(parts) for section_name, parts in section_parts.items()}
+
+# Function to process page ranges of a PDF in worker processes
+def map_page_ranges(worker, pdf_bytes, backend, page_count):
+    """
+    Run a worker over contiguous page ranges of a PDF in separate processes.
+    Neither PDF backend is thread-safe, so each process opens its own copy of the document.
+    :param worker: Function called as worker(pdf_bytes, backend, start, stop).
+    :param pdf_bytes: Raw bytes of the PDF.
+    :param backend: PDF library used to read the text, one of PDF_BACKENDS.
+    :param page_count: Number of pages in the PDF.
+    :return: List of worker results in page order.
+    """
+    workers = min(8, os.cpu_count() or 1, page_count)
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    # Spawn fresh interpreters on every platform: forking the multi-threaded Streamlit server
+    # (possibly with CUDA initialized) is unsafe, and workers only need to import this module
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+        return list(executor.map(worker, [pdf_bytes] * workers, [backend] * workers, bounds[:-1], bounds[1:]))